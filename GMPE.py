@@ -1,4 +1,5 @@
 import numpy as np
+from functools import partial
 
 def gmpe_HH_1992(Ms,Mw,Re,Rh,vs30,D):
     #震中距
@@ -47,14 +48,21 @@ def gmpe_GB_2015(Ms,Mw,Re,Rh,vs30,D):
     return corrected_pga/100
 
 
-def gmpe_Zhou_2019(Ms,Mw,Re,Rh,vs30,D):
+# 每个 IM 一行系数 (C1..C8, 单位换算除数)；新增 PGV/SA 只需添加一行
+_ZHOU2019_COEFFS = {
+    "PGA": (-1.26102, 1.2030, -0.044, -1.65, 0.1818, 0.7072, -9.82429e-6, 0.0050472, 100),  # cm/s² -> m/s²
+}
+
+def _zhou_2019(C,Ms,Mw,Re,Rh,vs30,D):
     #震中距
     Re=np.maximum(Re, 1)  # 避免 R=0 的情况
-    C1, C2, C3, C4, C5, C6 = -1.26102,1.2030,-0.044,-1.65,0.1818,0.7072
-    C7,C8=-9.82429e-6,0.0050472
-    lgPGA = C1+C2*Mw+C3*Mw**2+C4*np.log10(Re+C5*np.exp(C6*Mw))+C7*Re**2+C8*Re
+    C1, C2, C3, C4, C5, C6, C7, C8, div = C
+    lgY = C1+C2*Mw+C3*Mw**2+C4*np.log10(Re+C5*np.exp(C6*Mw))+C7*Re**2+C8*Re
     #C7*np.log(R)**2+C8*np.log(R)
-    return 10**lgPGA/100
+    return 10**lgY/div
+
+def gmpe_Zhou_2019(Ms,Mw,Re,Rh,vs30,D):
+    return _zhou_2019(_ZHOU2019_COEFFS["PGA"],Ms,Mw,Re,Rh,vs30,D)
 
 def gmpe_Wang_2023(Ms,Mw,Re,Rh,vs30,D):
     #震源距
@@ -87,3 +95,12 @@ for _k, _v in list(globals().items()):
         GMPE_REGISTRY.setdefault(_friendly, _v)
 if not GMPE_REGISTRY:
     raise RuntimeError("GMPE_REGISTRY is empty. Ensure gmpe_* functions are defined above.")
+
+# === GMPE_IMS: intensity measures per model (define AFTER GMPE_REGISTRY) ===
+# {model: {IM: fn}}, every fn with the gmpe_* signature. Models with a coefficient table
+# per IM register one entry per row; all others provide PGA (m/s²) only.
+GMPE_IMS = {
+    "Zhou_2019": {im: partial(_zhou_2019, C) for im, C in _ZHOU2019_COEFFS.items()},
+}
+for _k, _v in GMPE_REGISTRY.items():
+    GMPE_IMS.setdefault(_k, {"PGA": _v})
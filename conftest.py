@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def vs30_tif(tmp_path):
+    """Small synthetic VS30 GeoTIFF (EPSG:4326, 0.01 deg) covering 99.5-103.5E, 34.5-38.5N."""
+    rasterio = pytest.importorskip("rasterio")
+    pytest.importorskip("pyproj")
+    from rasterio.transform import from_origin
+
+    src = tmp_path / "vs30.tif"
+    with rasterio.open(src, "w", driver="GTiff", width=400, height=400, count=1, dtype="float32",
+                       crs="EPSG:4326", transform=from_origin(99.5, 38.5, 0.01, 0.01)) as dst:
+        dst.write(np.random.default_rng(0).uniform(200.0, 800.0, (400, 400)).astype("float32"), 1)
+    return str(src)
@@ -18,7 +18,18 @@ def load_registry() -> Dict[str, Callable]:
         raise RuntimeError("No GMPE functions discovered in GMPE.py")
     return registry
 
+def load_im_registry(registry: Dict[str, Callable]) -> Dict[str, Dict[str, Callable]]:
+    """{model: {IM: fn}}; models missing from GMPE.GMPE_IMS provide PGA only."""
+    GMPE = importlib.import_module("GMPE")
+    ims = getattr(GMPE, "GMPE_IMS", None)
+    out = {}
+    for name, fn in registry.items():
+        table = ims.get(name) if isinstance(ims, dict) else None
+        out[name] = dict(table) if table else {"PGA": fn}
+    return out
+
 _GMPE_REGISTRY = load_registry()
+_GMPE_IMS = load_im_registry(_GMPE_REGISTRY)
 _ACTIVE: List[Tuple[str, Callable]] = list(_GMPE_REGISTRY.items())
 
 def list_gmpes() -> List[str]:
@@ -33,3 +44,18 @@ def set_gmpes(names: Optional[List[str]]):
 
 def active_pairs() -> List[Tuple[str, Callable]]:
     return list(_ACTIVE)
+
+def list_ims() -> List[str]:
+    """All IMs declared by at least one registered model, PGA first."""
+    seen = {"PGA": None}
+    for table in _GMPE_IMS.values():
+        for im in table:
+            seen.setdefault(im, None)
+    return list(seen)
+
+def model_ims(name: str) -> List[str]:
+    return list(_GMPE_IMS.get(name, {}))
+
+def active_im_pairs(im: str) -> List[Tuple[str, Callable]]:
+    """Active models that declare `im`, in active order."""
+    return [(n, _GMPE_IMS[n][im]) for n, _ in _ACTIVE if im in _GMPE_IMS.get(n, {})]
@@ -1,20 +1,136 @@
-
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
 import numpy as np
 
+LEVEL_NODATA = 255  # uint8 class id for cells without a finite PGA
+_CHUNK = 1 << 20    # cells per block (whole rows); bounds the searchsorted index temporaries
+
+@dataclass(frozen=True)
+class IntensityScale:
+    """PGA (m/s^2) class table plus the continuous-intensity law I = a*ln(max(PGA, floor)) + b.
+
+    edges[k] separates class k from class k+1; closed_left[k] says whether PGA == edges[k]
+    already belongs to the upper class (k+1) rather than to class k.
+    """
+    name: str
+    edges: Tuple[float, ...]
+    closed_left: Tuple[bool, ...]
+    a: float = 1.5
+    b: float = 8.0
+    floor: float = 1e-6
+
+    def __post_init__(self):
+        if len(self.edges) != len(self.closed_left):
+            raise ValueError("edges and closed_left must have the same length")
+        if list(self.edges) != sorted(self.edges):
+            raise ValueError("edges must be ascending")
+        if len(self.edges) + 1 > LEVEL_NODATA:
+            raise ValueError(f"At most {LEVEL_NODATA} classes fit in uint8 levels")
+
+    @property
+    def n_classes(self) -> int:
+        return len(self.edges) + 1
+
+    def search_edges(self) -> np.ndarray:
+        """Edges for searchsorted(side='left'): a left-closed edge is nudged one ulp down,
+        so `p >= edge` and `p > nudged_edge` select exactly the same values."""
+        e = np.asarray(self.edges, dtype=float)
+        return np.where(self.closed_left, np.nextafter(e, -np.inf), e)
+
+@dataclass
+class IntensityResult:
+    intensity: Optional[np.ndarray]  # float64, NaN where PGA is NaN; None if not requested
+    levels: np.ndarray      # uint8 class ids, LEVEL_NODATA where PGA is not finite
+    counts: np.ndarray      # cells per class, length scale.n_classes
+    areas: Optional[np.ndarray]  # summed cell_areas per class, if cell_areas was given
+
+INTENSITY_SCALES: Dict[str, IntensityScale] = {}
+
+def register_intensity_scale(scale: IntensityScale):
+    INTENSITY_SCALES[scale.name] = scale
+
+# China seismic intensity scale (GB/T 17742-2020) PGA ranges; class 0 is below VI, 7 is XII.
+register_intensity_scale(IntensityScale(
+    name="GB17742",
+    edges=(0.457, 0.936, 1.94, 4.01, 8.30, 17.2, 35.5),
+    closed_left=(True, False, False, False, False, False, False),
+))
+DEFAULT_SCALE = "GB17742"
+
+def _get_scale(scale: Union[str, IntensityScale]) -> IntensityScale:
+    if isinstance(scale, IntensityScale):
+        return scale
+    try:
+        return INTENSITY_SCALES[scale]
+    except KeyError:
+        raise ValueError(f"Unknown intensity scale '{scale}'. Known: {list(INTENSITY_SCALES)}") from None
+
+def intensity_stage(pga_arr, scale: Union[str, IntensityScale]=DEFAULT_SCALE,
+                    out_intensity: Optional[np.ndarray]=None, out_levels: Optional[np.ndarray]=None,
+                    cell_areas: Optional[np.ndarray]=None, intensity: bool=True) -> IntensityResult:
+    """Continuous intensity, class map and per-class counts/areas in one blocked pass over PGA.
+
+    out_intensity (float64) / out_levels (uint8) may be preallocated C-contiguous arrays of
+    the PGA shape; out_intensity may also be the PGA array itself (computed in place).
+    cell_areas: per-cell ground area (e.g. vs30_io.cell_area_km2, shape (H, 1)), broadcast
+    against the grid and summed per class into `areas`.
+    intensity=False computes levels/counts/areas only (result.intensity is None).
+    """
+    sc = _get_scale(scale)
+    p = np.asarray(pga_arr, dtype=float)
+    if out_levels is None:
+        out_levels = np.empty(p.shape, dtype=np.uint8)
+    outs = [("out_levels", out_levels, np.uint8)]
+    if intensity:
+        if out_intensity is None:
+            out_intensity = np.empty(p.shape, dtype=float)
+        outs.append(("out_intensity", out_intensity, np.float64))
+    else:
+        out_intensity = None
+    for name, arr, dt in outs:
+        if arr.shape != p.shape or arr.dtype != dt or not arr.flags.c_contiguous:
+            raise ValueError(f"{name} must be a C-contiguous {np.dtype(dt).name} array of shape {p.shape}")
+
+    if p.size == 0:
+        areas = np.zeros(sc.n_classes, dtype=float) if cell_areas is not None else None
+        return IntensityResult(out_intensity, out_levels, np.zeros(sc.n_classes, dtype=np.int64), areas)
+
+    # Work on (rows, cols) blocks so per-row cell areas broadcast without a full-grid copy
+    p2 = p.reshape(-1, p.shape[-1]) if p.ndim else p.reshape(1, 1)
+    L2 = out_levels.reshape(p2.shape)
+    I2 = out_intensity.reshape(p2.shape) if intensity else None
+    A2 = None
+    if cell_areas is not None:
+        if np.ndim(cell_areas) == 0:
+            raise ValueError("cell_areas must be per-cell (or per-row) ground areas, not a scalar")
+        A2 = np.broadcast_to(np.asarray(cell_areas, dtype=float), p.shape).reshape(p2.shape)
+
+    edges = sc.search_edges()
+    counts = np.zeros(sc.n_classes, dtype=np.int64)
+    areas = np.zeros(sc.n_classes, dtype=float) if A2 is not None else None
+    rows = max(1, _CHUNK // max(1, p2.shape[1]))
+    for r in range(0, p2.shape[0], rows):
+        pc, Lc = p2[r:r+rows], L2[r:r+rows]
+        # classes first: the intensity block may alias pc when computing in place
+        Lc[...] = np.searchsorted(edges, pc, side="left")
+        Lc[~np.isfinite(pc)] = LEVEL_NODATA
+        counts += np.bincount(Lc.ravel(), minlength=LEVEL_NODATA + 1)[:sc.n_classes]
+        if A2 is not None:
+            areas += np.bincount(Lc.ravel(), weights=A2[r:r+rows].ravel(), minlength=LEVEL_NODATA + 1)[:sc.n_classes]
+        if I2 is not None:
+            Ic = I2[r:r+rows]
+            np.maximum(pc, sc.floor, out=Ic)
+            np.log(Ic, out=Ic)
+            Ic *= sc.a
+            Ic += sc.b
+
+    return IntensityResult(out_intensity, out_levels, counts, areas)
+
 def pga_to_intensity(pga_arr):
     p = np.asarray(pga_arr, dtype=float)
     return 1.5*np.log(np.maximum(p, 1e-6)) + 8.0
 
 def classify_intensity_levels_from_pga(pga_arr):
-    p = np.asarray(pga_arr, dtype=float)
-    levels = np.full(p.shape, np.nan, dtype=float)
-    m = np.isfinite(p)
-    levels[(m) & (p < 0.457)] = 0
-    levels[(m) & (p >= 0.457) & (p <= 0.936)] = 1
-    levels[(m) & (p > 0.936) & (p <= 1.94)] = 2
-    levels[(m) & (p > 1.94) & (p <= 4.01)] = 3
-    levels[(m) & (p > 4.01) & (p <= 8.30)] = 4
-    levels[(m) & (p > 8.30) & (p <= 17.2)] = 5
-    levels[(m) & (p > 17.2) & (p <= 35.5)] = 6
-    levels[(m) & (p > 35.5)] = 7
-    return levels
+    """Legacy float64 class map (NaN outside finite PGA); prefer intensity_stage()."""
+    lv = intensity_stage(pga_arr, intensity=False).levels
+    return np.where(lv == LEVEL_NODATA, np.nan, lv.astype(float))
@@ -9,3 +9,17 @@ def save_geotiff(path, arr, transform, crs, nodata=None):
                        dtype=arr.dtype, crs=crs, transform=transform, nodata=nodata) as dst:
         data = np.array(arr, copy=False)
         dst.write(data, 1)
+
+def save_geotiff_bands(path, bands, transform, crs, nodata=None):
+    """Write several 2D arrays as one multi-band GeoTIFF; `bands` is [(description, arr), ...]."""
+    if not bands: raise ValueError("Expect at least one band")
+    arrs = [np.asarray(a) for _, a in bands]
+    if any(a.ndim != 2 or a.shape != arrs[0].shape for a in arrs):
+        raise ValueError("Expect 2D arrays of identical shape")
+    h, w = arrs[0].shape
+    dtype = np.result_type(*arrs)
+    with rasterio.open(path, 'w', driver='GTiff', width=w, height=h, count=len(arrs),
+                       dtype=dtype, crs=crs, transform=transform, nodata=nodata) as dst:
+        for i, ((desc, _), a) in enumerate(zip(bands, arrs), start=1):
+            dst.write(a.astype(dtype, copy=False), i)
+            dst.set_band_description(i, str(desc))
@@ -0,0 +1,241 @@
+"""
+job_manager.py
+--------------
+Bounded job queue that runs `pipeline_adapter.run_simulation` in worker processes
+(or `run_simulation_ims` when a job is submitted with an `ims` list).
+
+Design
+- Jobs wait in a bounded FIFO and are dispatched to a ProcessPoolExecutor, at most
+  `max_workers` at a time (processes, so concurrent runs do not share the GIL).
+- Workers push (job_id, kind, payload) events onto a Manager queue; `poll()` drains it.
+  The manager is NOT thread-safe: call every method from one thread (the Tk thread),
+  e.g. by scheduling `poll()` with `widget.after(...)`.
+- Cancellation is cooperative: each job gets a shared Event, checked by the progress
+  callback that `run_simulation`/`generate_pga` invoke between stages and file writes.
+- Two jobs writing the same outputs (same output folder + event name) are refused.
+- If a worker process dies (e.g. killed for memory), its running jobs fail and the
+  pool is rebuilt for the jobs still queued.
+"""
+from __future__ import annotations
+import multiprocessing as mp
+import queue
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "Queued", "Running", "Done", "Failed", "Cancelled"
+_FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker at the next progress point after cancel() was requested."""
+
+
+class JobFailed(Exception):
+    """Worker-side failure; args = (message, formatted traceback) so both survive pickling."""
+
+
+class QueueFull(RuntimeError):
+    """Raised by submit() when the pending queue is at capacity."""
+
+
+@dataclass
+class Job:
+    id: int
+    name: str
+    kwargs: Dict[str, Any]
+    status: str = QUEUED
+    stage: str = ""
+    progress: float = 0.0
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Optional[tuple] = None
+    error: Optional[str] = None
+    traceback: Optional[str] = None
+
+    @property
+    def output_key(self) -> tuple:
+        return (str(Path(self.kwargs["out_dir"]).resolve()), self.name)
+
+    @property
+    def elapsed(self) -> Optional[float]:
+        if self.started is None:
+            return None
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in _FINISHED
+
+
+def _run_job(job_id: int, kwargs: Dict[str, Any], events, cancel_event):
+    """Worker-process entry point (module level so it can be pickled)."""
+    from pipeline_adapter import run_simulation, run_simulation_ims
+
+    def progress(stage: str, fraction: float):
+        if cancel_event.is_set():
+            raise JobCancelled(stage)
+        events.put((job_id, "progress", (stage, float(fraction))))
+
+    events.put((job_id, "started", time.time()))
+    try:
+        if kwargs.get("ims"):
+            return run_simulation_ims(progress=progress, **kwargs)
+        return run_simulation(progress=progress, **{k: v for k, v in kwargs.items() if k != "ims"})
+    except JobCancelled:
+        raise
+    except Exception as e:
+        tb = "".join(traceback.format_exception(type(e), e, e.__traceback__))
+        raise JobFailed(str(e) or type(e).__name__, tb) from None
+
+
+class JobManager:
+    def __init__(self, max_workers: int = 2, max_queued: int = 64):
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        self.max_workers = int(max_workers)
+        self.max_queued = int(max_queued)
+        self._jobs: Dict[int, Job] = {}
+        self._pending: deque = deque()
+        self._running: Dict[int, tuple] = {}  # job_id -> (future, cancel_event)
+        self._next_id = 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._mp_manager = None
+        self._events = None
+
+    # ---- public API (Tk thread only) ----
+    def submit(self, name: str, **kwargs) -> Job:
+        """Queue a run_simulation(name=name, **kwargs) call and return its Job record.
+
+        A non-empty `ims` kwarg selects run_simulation_ims (multi-band product) instead.
+        """
+        if len(self._pending) >= self.max_queued:
+            raise QueueFull(f"Job queue is full ({self.max_queued} pending).")
+        job = Job(id=self._next_id, name=name, kwargs=dict(kwargs, name=name))
+        for other in self._jobs.values():
+            if not other.is_finished and other.output_key == job.output_key:
+                raise ValueError(f"A job for '{name}' writing to {job.kwargs['out_dir']} is already {other.status.lower()}.")
+        self._next_id += 1
+        self._jobs[job.id] = job
+        self._pending.append(job.id)
+        self._dispatch()
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """Request cancellation; queued jobs are dropped, running ones stop at the next stage."""
+        job = self._jobs.get(job_id)
+        if job is None or job.is_finished:
+            return False
+        if job_id in self._pending:
+            self._pending.remove(job_id)
+            job.status, job.finished = CANCELLED, time.time()
+            return True
+        fut, cancel_event = self._running[job_id]
+        cancel_event.set()
+        job.stage = "cancelling"
+        return True
+
+    def jobs(self) -> List[Job]:
+        return list(self._jobs.values())
+
+    def get(self, job_id: int) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def clear_finished(self):
+        for jid in [j.id for j in self._jobs.values() if j.is_finished]:
+            del self._jobs[jid]
+
+    def poll(self) -> List[Job]:
+        """Apply worker events and completed futures; return the jobs that changed."""
+        changed = {}
+        if self._events is not None:
+            while True:
+                try:
+                    job_id, kind, payload = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                job = self._jobs.get(job_id)
+                if job is None or job.is_finished:
+                    continue
+                if kind == "started":
+                    job.status, job.started = RUNNING, payload
+                elif kind == "progress" and job.stage != "cancelling":
+                    job.stage, job.progress = payload
+                changed[job_id] = job
+
+        for job_id, (fut, _) in list(self._running.items()):
+            if not fut.done():
+                continue
+            del self._running[job_id]
+            job = self._jobs.get(job_id)
+            if job is None:
+                continue
+            job.finished = time.time()
+            if job.started is None:
+                job.started = job.finished
+            exc = fut.exception()
+            if exc is None:
+                job.status, job.result, job.progress = DONE, fut.result(), 1.0
+            elif isinstance(exc, JobCancelled):
+                job.status = CANCELLED
+            elif isinstance(exc, JobFailed):
+                job.status, job.error, job.traceback = FAILED, exc.args[0], exc.args[1]
+            else:  # e.g. BrokenProcessPool
+                job.status, job.error = FAILED, str(exc) or type(exc).__name__
+                if isinstance(exc, BrokenProcessPool):
+                    self._reset_pool()
+            changed[job_id] = job
+
+        self._dispatch()
+        return list(changed.values())
+
+    def shutdown(self):
+        for _, cancel_event in self._running.values():
+            cancel_event.set()
+        self._pending.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._mp_manager is not None:
+            self._mp_manager.shutdown()
+            self._mp_manager = None
+            self._events = None
+
+    # ---- internals ----
+    def _ensure_pool(self):
+        if self._mp_manager is None:
+            self._mp_manager = mp.Manager()
+            self._events = self._mp_manager.Queue()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def _reset_pool(self):
+        """Drop a broken executor; the next dispatch builds a fresh one."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _dispatch(self):
+        retried = False
+        while self._pending and len(self._running) < self.max_workers:
+            self._ensure_pool()
+            job = self._jobs[self._pending.popleft()]
+            cancel_event = self._mp_manager.Event()
+            try:
+                fut = self._executor.submit(_run_job, job.id, job.kwargs, self._events, cancel_event)
+            except BrokenProcessPool as e:
+                self._reset_pool()
+                if not retried:  # put the job back and try once more on a fresh pool
+                    retried = True
+                    self._pending.appendleft(job.id)
+                    continue
+                job.status, job.error, job.finished = FAILED, str(e) or type(e).__name__, time.time()
+                continue
+            self._running[job.id] = (fut, cancel_event)
+            job.stage = "starting"
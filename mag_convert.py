@@ -1,5 +1,6 @@
 
 import datetime as _dt
+import numpy as np
 
 _PERIODS = [
     ((1900,1,1), (1965,12,31),  {'ge7': (1.06, -0.58), 'lt7': (0.74, 1.64)}),
@@ -14,10 +15,11 @@ def _parse_date_ddmmyyyy(date_str: str) -> _dt.date:
     d, m, y = int(s[:2]), int(s[2:4]), int(s[4:])
     return _dt.date(y, m, d)
 
+_PERIOD_DATES = [(_dt.date(*a), _dt.date(*b), params) for (a, b, params) in _PERIODS]
+
 def _period_params(date_str: str):
     d = _parse_date_ddmmyyyy(date_str)
-    for (a, b, params) in _PERIODS:
-        start = _dt.date(*a); end = _dt.date(*b)
+    for (start, end, params) in _PERIOD_DATES:
         if start <= d <= end: return params
     return _PERIODS[-1][2]
 
@@ -31,3 +33,85 @@ def mw_to_ms(mw: float, date_str: str) -> float:
     a_ge, b_ge = params['ge7']; ms_ge = (float(mw) - b_ge)/a_ge
     if ms_ge >= 7.0: return ms_ge
     a_lt, b_lt = params['lt7']; return (float(mw) - b_lt)/a_lt
+
+# ---- Array API (whole catalogs) ----
+# Same coefficients and branch rules as the scalar functions, so results are bit-identical.
+_STARTS = np.array([start for start, _, _ in _PERIOD_DATES], dtype='M8[D]')
+_ENDS   = np.array([end for _, end, _ in _PERIOD_DATES], dtype='M8[D]')
+_GE7 = np.array([p['ge7'] for _, _, p in _PERIOD_DATES], dtype=float)  # (n_periods, 2) = (a, b)
+_LT7 = np.array([p['lt7'] for _, _, p in _PERIOD_DATES], dtype=float)
+
+def parse_dates(dates) -> np.ndarray:
+    """DDMMYYYY strings (with optional '/' or '-'), datetime64 or datetime.date -> datetime64[D] array."""
+    arr = np.asarray(dates)
+    if arr.size == 0:
+        return np.empty(arr.shape, dtype='M8[D]')
+    if arr.dtype.kind == 'M':
+        out = arr.astype('M8[D]')
+        if np.isnat(out).any():
+            raise ValueError("Invalid event date(s): NaT")
+        return out
+    if arr.dtype.kind == 'O':
+        # mixed date objects / datetime64 / strings: dates go through the DDMMYYYY path too
+        def _ddmmyyyy(x):
+            if isinstance(x, np.datetime64):
+                x = x.astype('M8[D]').item()
+            if isinstance(x, _dt.date):
+                return f"{x.day:02d}{x.month:02d}{x.year:04d}"
+            return str(x)
+        arr = np.array([_ddmmyyyy(x) for x in arr.flat]).reshape(arr.shape)
+    s = np.char.strip(arr.astype(str))
+    s = np.char.replace(np.char.replace(s, '/', ''), '-', '')
+    if not np.all((np.char.str_len(s) == 8) & np.char.isdigit(s)):
+        raise ValueError("Event date must be DDMMYYYY, e.g., 12071927.")
+    v = s.astype(np.int64)
+    d, m, y = v // 1000000, (v // 10000) % 100, v % 10000
+    month = np.datetime64('1970-01', 'M') + ((y - 1970)*12 + (m - 1)).astype('m8[M]')
+    out = month.astype('M8[D]') + (d - 1).astype('m8[D]')
+    # reject what datetime.date would reject (day past month end, month/day/year out of range)
+    bad = (y < 1) | (m < 1) | (m > 12) | (d < 1) | (out.astype('M8[M]') != month)
+    if np.any(bad):
+        raise ValueError(f"Invalid event date(s): {s[bad][:5].tolist()}")
+    return out
+
+def _period_index(dates) -> np.ndarray:
+    """Index into _PERIODS per date; dates outside every period use the last one."""
+    d = parse_dates(dates)
+    k = np.searchsorted(_STARTS, d, side='right') - 1
+    kc = np.clip(k, 0, len(_STARTS) - 1)
+    inside = (k >= 0) & (d <= _ENDS[kc])
+    return np.where(inside, kc, len(_STARTS) - 1)
+
+def _ms_to_mw_k(ms: np.ndarray, k: np.ndarray) -> np.ndarray:
+    ge = ms >= 7.0
+    a = np.where(ge, _GE7[k, 0], _LT7[k, 0])
+    b = np.where(ge, _GE7[k, 1], _LT7[k, 1])
+    return a*ms + b
+
+def _mw_to_ms_k(mw: np.ndarray, k: np.ndarray) -> np.ndarray:
+    ms_ge = (mw - _GE7[k, 1])/_GE7[k, 0]
+    ms_lt = (mw - _LT7[k, 1])/_LT7[k, 0]
+    return np.where(ms_ge >= 7.0, ms_ge, ms_lt)
+
+def ms_to_mw_array(ms, dates) -> np.ndarray:
+    """Vectorised ms_to_mw; `dates` broadcasts against `ms` (one date or one per event)."""
+    ms, k = np.broadcast_arrays(np.asarray(ms, dtype=float), _period_index(dates))
+    return _ms_to_mw_k(ms, k)
+
+def mw_to_ms_array(mw, dates) -> np.ndarray:
+    """Vectorised mw_to_ms; `dates` broadcasts against `mw` (one date or one per event)."""
+    mw, k = np.broadcast_arrays(np.asarray(mw, dtype=float), _period_index(dates))
+    return _mw_to_ms_k(mw, k)
+
+def convert_catalog(mag_values, mag_types, dates):
+    """Catalog form of the per-event Ms/Mw conversion: returns (ms, mw) arrays.
+
+    mag_types is 'Ms'/'Mw' (case-insensitive), one for all events or one per event;
+    the given magnitude is passed through and the other one converted.
+    Dates are parsed and matched to periods once for the whole catalog.
+    """
+    is_ms = np.char.upper(np.asarray(mag_types).astype(str)) == 'MS'
+    mags, is_ms, k = np.broadcast_arrays(np.asarray(mag_values, dtype=float), is_ms, _period_index(dates))
+    ms = np.where(is_ms, mags, _mw_to_ms_k(mags, k))
+    mw = np.where(is_ms, _ms_to_mw_k(mags, k), mags)
+    return ms, mw
@@ -1,23 +1,27 @@
 
-import threading
+import multiprocessing
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from pipeline_adapter import run_simulation
+from job_manager import JobManager, DONE, FAILED
 
 APP_TITLE = "Rapid Ground Motion 1.3"
+MAX_CONCURRENT_RUNS = int(os.environ.get("RAPIDGM_WORKERS", "2"))
+POLL_MS = 200
 
 SECTION_COLORS = {
     "eq": "#F0F7FF",
     "data": "#F7FFF2",
     "opt": "#FFF7F0",
+    "jobs": "#F5F5FA",
 }
 
 class App(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title(APP_TITLE)
-        self.geometry("1040x800")
-        self.minsize(820, 640)
+        self.geometry("1040x960")
+        self.minsize(820, 760)
         self.configure(bg="#f5f6f9")
         self._init_style()
 
@@ -35,6 +39,9 @@ class App(tk.Tk):
         self.var_gmpe_mode = tk.StringVar(value="Use default")
         self.var_save_per_model = tk.StringVar(value="No")
         self.selected_gmpes = []
+        self.selected_ims = ["PGA"]
+        self.var_ims = tk.StringVar(value="PGA")
+        self.jobs = JobManager(max_workers=MAX_CONCURRENT_RUNS)
 
         outer = ttk.Frame(self, padding=16)
         outer.pack(fill=tk.BOTH, expand=True)
@@ -76,11 +83,33 @@ class App(tk.Tk):
 
         self._row(opt_content, "Save per-GMPE maps", ttk.Combobox(opt_content, textvariable=self.var_save_per_model, values=["Yes","No"], state="readonly", width=10), r=2)
 
+        im_line = ttk.Frame(opt_content)
+        ttk.Label(im_line, textvariable=self.var_ims, width=24).pack(side=tk.LEFT, padx=(0,8))
+        ttk.Button(im_line, text="Select IMs...", command=self.open_im_selector).pack(side=tk.LEFT)
+        self._row(opt_content, "Intensity measures", im_line, r=3)
+
         run = ttk.Frame(outer, padding=(0,8)); run.pack(fill=tk.X, pady=(8,0))
         self.status = tk.StringVar(value="Ready")
         ttk.Label(run, textvariable=self.status, foreground="#1b7f2a").pack(side=tk.LEFT)
         ttk.Button(run, text="Run", command=self.on_start).pack(side=tk.RIGHT)
 
+        jobs_frame = self._section(outer, f"Jobs (up to {MAX_CONCURRENT_RUNS} concurrent)", SECTION_COLORS["jobs"])
+        jobs_frame.pack_configure(fill=tk.BOTH, expand=True)
+        cols = ("name", "status", "stage", "progress", "elapsed")
+        self.job_tree = ttk.Treeview(jobs_frame, columns=cols, show="headings", height=6)
+        for c, w in zip(cols, (260, 90, 110, 80, 80)):
+            self.job_tree.heading(c, text=c.capitalize())
+            self.job_tree.column(c, width=w, anchor="w")
+        self.job_tree.pack(fill=tk.BOTH, expand=True)
+        self.job_tree.bind("<Double-1>", lambda e: self.show_job_result())
+        job_btns = ttk.Frame(jobs_frame); job_btns.pack(fill=tk.X, pady=(6,0))
+        ttk.Button(job_btns, text="Cancel selected", command=self.cancel_selected).pack(side=tk.LEFT)
+        ttk.Button(job_btns, text="Clear finished", command=self.clear_finished).pack(side=tk.LEFT, padx=8)
+        ttk.Button(job_btns, text="Show result", command=self.show_job_result).pack(side=tk.RIGHT)
+
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(POLL_MS, self._poll_jobs)
+
     def _init_style(self):
         style = ttk.Style(self)
         try: style.theme_use("clam")
@@ -141,6 +170,28 @@ class App(tk.Tk):
         ttk.Separator(frm).pack(fill=tk.X, pady=6)
         ttk.Button(frm, text="OK", command=lambda: (setattr(self, "selected_gmpes", [n for n,v in vars_map.items() if v.get()]), win.destroy())).pack(side=tk.RIGHT)
 
+    def open_im_selector(self):
+        try:
+            import gmpe_registry
+            names = gmpe_registry.list_ims()
+            providers = {im: [g for g in gmpe_registry.list_gmpes() if im in gmpe_registry.model_ims(g)] for im in names}
+        except Exception as e:
+            messagebox.showerror("Error", f"Cannot list intensity measures: {e}")
+            return
+        win = tk.Toplevel(self); win.title("Choose intensity measures"); win.resizable(False, False)
+        frm = ttk.Frame(win, padding=12); frm.pack(fill=tk.BOTH, expand=True)
+        vars_map = {}
+        for row, n in enumerate(names):
+            vars_map[n] = tk.BooleanVar(value=(n in self.selected_ims))
+            ttk.Checkbutton(frm, text=f"{n}  ({len(providers[n])} GMPEs: {', '.join(providers[n])})", variable=vars_map[n]).grid(row=row, column=0, sticky='w', padx=4, pady=2)
+
+        def ok():
+            self.selected_ims = [n for n, v in vars_map.items() if v.get()] or ["PGA"]
+            self.var_ims.set(", ".join(self.selected_ims))
+            win.destroy()
+        ttk.Separator(frm).grid(row=len(names), column=0, sticky='ew', pady=6)
+        ttk.Button(frm, text="OK", command=ok).grid(row=len(names)+1, column=0, sticky='e')
+
     def on_start(self):
         try:
             name = self.var_name.get().strip() or "event"
@@ -155,33 +206,94 @@ class App(tk.Tk):
             convert_flag = (self.var_convert.get() == "Yes")
             # Always pass selected subset if user checked any; otherwise None => use all
             selected = self.selected_gmpes if self.selected_gmpes else None
+            # PGA alone keeps the classic single-band outputs; anything else => multi-band IM product
+            ims = None if self.selected_ims == ["PGA"] else list(self.selected_ims)
         except Exception as e:
             messagebox.showerror("Input error", str(e)); return
 
-        self.status.set("Running...")
-        def task():
-            try:
-                (pga_path, intensity_path, weights_txt, per_model_paths, weights_list) = run_simulation(
-                    name=name, lon=lon, lat=lat, mag_value=mag_value, mag_type=mag_type, event_date=event_date,
-                    depth_km=depth, radius_km=radius_km, vs30_path=vs30_path, out_dir=outdir,
-                    convert_to_intensity=convert_flag, selected_gmpes=selected,
-                    save_per_model=(self.var_save_per_model.get()=="Yes")
-                )
-                msg = (
-                    f"PGA saved to:\n{pga_path}\n\n"
-                    "GMPE weights (also saved to file):\n"
-                    + "\n".join([f"  {name}: {w:.4f}" for name, w in weights_list])
-                    + f"\n\nWeights file:\n{weights_txt}"
-                )
+        try:
+            job = self.jobs.submit(
+                name, lon=lon, lat=lat, mag_value=mag_value, mag_type=mag_type, event_date=event_date,
+                depth_km=depth, radius_km=radius_km, vs30_path=vs30_path, out_dir=outdir,
+                convert_to_intensity=convert_flag, selected_gmpes=selected,
+                save_per_model=(self.var_save_per_model.get()=="Yes"), ims=ims
+            )
+        except Exception as e:  # QueueFull, duplicate output, pool start-up errors
+            messagebox.showerror("Cannot queue", str(e)); return
+        self._render_job(job)
+        self.status.set(f"Queued: {job.name}")
+
+    # ---- jobs panel (all on the Tk thread) ----
+    def _poll_jobs(self):
+        try:
+            for job in self.jobs.poll():
+                self._render_job(job)
+                if job.status == DONE:
+                    self.status.set(f"Done: {job.name}")
+                elif job.status == FAILED:
+                    self.status.set(f"Failed: {job.name}")
+            for job in self.jobs.jobs():
+                if not job.is_finished and job.started is not None:
+                    self._render_job(job)  # refresh elapsed time
+        finally:
+            self.after(POLL_MS, self._poll_jobs)
+
+    def _render_job(self, job):
+        elapsed = "" if job.elapsed is None else f"{job.elapsed:.1f} s"
+        values = (job.name, job.status, job.stage, f"{100*job.progress:.0f}%", elapsed)
+        iid = str(job.id)
+        if self.job_tree.exists(iid):
+            self.job_tree.item(iid, values=values)
+        else:
+            self.job_tree.insert("", tk.END, iid=iid, values=values)
+
+    def _selected_jobs(self):
+        return [self.jobs.get(int(iid)) for iid in self.job_tree.selection() if self.jobs.get(int(iid))]
+
+    def cancel_selected(self):
+        for job in self._selected_jobs():
+            self.jobs.cancel(job.id)
+            self._render_job(job)
+
+    def clear_finished(self):
+        for job in self.jobs.jobs():
+            if job.is_finished and self.job_tree.exists(str(job.id)):
+                self.job_tree.delete(str(job.id))
+        self.jobs.clear_finished()
+
+    def show_job_result(self):
+        for job in self._selected_jobs()[:1]:
+            if job.status == FAILED:
+                msg = f"{job.name}:\n{job.error}"
+                if job.traceback:
+                    msg += "\n\n" + job.traceback
+                messagebox.showerror("Error", msg)
+            elif job.status == DONE:
+                if job.kwargs.get("ims"):
+                    (product_path, intensity_path, weights_txt, per_model_paths, weights_by_im) = job.result
+                    msg = f"IM product ({', '.join(job.kwargs['ims'])}) saved to:\n{product_path}\n\nGMPE weights (also saved to file):"
+                    for im, weights_list in weights_by_im.items():
+                        msg += f"\n {im}:\n" + "\n".join([f"  {name}: {w:.4f}" for name, w in weights_list])
+                else:
+                    (pga_path, intensity_path, weights_txt, per_model_paths, weights_list) = job.result
+                    msg = (
+                        f"PGA saved to:\n{pga_path}\n\n"
+                        "GMPE weights (also saved to file):\n"
+                        + "\n".join([f"  {name}: {w:.4f}" for name, w in weights_list])
+                    )
+                msg += f"\n\nWeights file:\n{weights_txt}" + f"\n\nElapsed: {job.elapsed:.1f} s"
                 if per_model_paths:
                     msg += "\n\nPer-GMPE maps:\n" + "\n".join([f"  {p}" for p in per_model_paths])
                 if intensity_path:
                     msg += f"\n\nIntensity saved to:\n{intensity_path} (and class map)"
-                self.status.set("Done")
                 messagebox.showinfo("Finished", msg)
-            except Exception as e:
-                self.status.set("Failed"); messagebox.showerror("Error", str(e))
-        threading.Thread(target=task, daemon=True).start()
+            else:
+                messagebox.showinfo(job.status, f"{job.name}: {job.status.lower()}")
+
+    def on_close(self):
+        self.jobs.shutdown()
+        self.destroy()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # required for worker processes in the frozen (PyInstaller) build
     App().mainloop()
@@ -1,16 +1,14 @@
 
+import re
 from pathlib import Path
-from typing import Optional, Tuple, List
-from io_geotiff import save_geotiff
+from typing import Optional, Tuple, List, Callable, Dict, Sequence
+from io_geotiff import save_geotiff, save_geotiff_bands
+from vs30_io import cell_area_km2
 
 import user_pipeline
 
-def run_simulation(name: str, lon: float, lat: float, mag_value: float, mag_type: str, event_date: str,
-                   depth_km: float, radius_km: float, vs30_path: str, out_dir: str,
-                   convert_to_intensity: bool, selected_gmpes=None, save_per_model: bool=False) -> Tuple[str, Optional[str], str, List[str], List[tuple]]:
-    out = Path(out_dir); out.mkdir(parents=True, exist_ok=True)
-
-    # Ms <-> Mw conversion
+def _convert_magnitudes(mag_value: float, mag_type: str, event_date: str) -> Tuple[float, float]:
+    """Return (ms, mw) from the user-entered magnitude."""
     from mag_convert import ms_to_mw, mw_to_ms
     if mag_type.upper() == 'MS':
         ms = float(mag_value)
@@ -18,41 +16,154 @@ def run_simulation(name: str, lon: float, lat: float, mag_value: float, mag_type
     else:
         mw = float(mag_value)
         ms = float(mw_to_ms(mw, event_date))
+    return ms, mw
+
+def _write_weights(path: Path, weights_by_im: Dict[str, List[tuple]]):
+    # Single-IM (PGA) files keep the original layout; multi-IM files get one section per IM.
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("# GMPE Weights\n")
+        for im, weights_list in weights_by_im.items():
+            if len(weights_by_im) > 1:
+                f.write(f"# {im}\n")
+            for model_name, w in weights_list:
+                f.write(f"{model_name}\t{w:.6f}\n")
+
+def _im_tag(im: str) -> str:
+    """Filename-safe IM label, e.g. 'SA(0.3)' -> 'SA0.3'."""
+    return re.sub(r"[^0-9A-Za-z.]+", "", im)
+
+def _write_intensity(out: Path, name: str, pga_arr, transform, crs, report) -> Path:
+    """Write intensity, uint8 level map and level summary; pga_arr is overwritten with intensity."""
+    report("intensity", 0.0)
+    # One fused pass: continuous intensity, uint8 class map and per-class cell counts/areas.
+    # Areas are true ground areas; 1 km Mercator pixels cover ~cos^2(lat) km^2.
+    cell_areas = cell_area_km2(transform, crs, pga_arr.shape)
+    res = user_pipeline.intensity_stage(pga_arr, out_intensity=pga_arr, cell_areas=cell_areas)
+    intensity_path = out / f"{name}_IntensityI.tif"
+    save_geotiff(intensity_path, res.intensity, transform, crs)
+
+    report("intensity", 0.5)
+    lvl_path = out / f"{name}_IntensityLevel.tif"
+    save_geotiff(lvl_path, res.levels, transform, crs, nodata=user_pipeline.LEVEL_NODATA)
+
+    summary_txt = out / f"{name}_IntensityLevel_summary.txt"
+    with open(summary_txt, 'w', encoding='utf-8') as f:
+        f.write("# Level\tCells\tArea_km2\n")
+        for lvl, (n, a) in enumerate(zip(res.counts, res.areas)):
+            f.write(f"{lvl}\t{int(n)}\t{a:.3f}\n")
+    return intensity_path
+
+# Share of the whole run per stage, so reported progress never moves backwards.
+# "weights" is reported on the same scale as "predict" (see user_pipeline.generate_ims).
+_STAGE_RANGES = {
+    "vs30": (0.0, 0.10), "distances": (0.10, 0.15),
+    "predict": (0.15, 0.70), "weights": (0.15, 0.70),
+    "write": (0.70, 0.90), "intensity": (0.90, 1.0), "done": (1.0, 1.0),
+}
+
+def _overall_progress(progress: Optional[Callable[[str, float], None]]):
+    """Wrap progress(stage, fraction-of-stage) into progress(stage, fraction-of-run)."""
+    if progress is None:
+        return None
+    def wrapped(stage: str, fraction: float):
+        lo, hi = _STAGE_RANGES.get(stage, (0.0, 1.0))
+        progress(stage, lo + (hi - lo) * min(max(float(fraction), 0.0), 1.0))
+    return wrapped
+
+def run_simulation(name: str, lon: float, lat: float, mag_value: float, mag_type: str, event_date: str,
+                   depth_km: float, radius_km: float, vs30_path: str, out_dir: str,
+                   convert_to_intensity: bool, selected_gmpes=None, save_per_model: bool=False,
+                   progress: Optional[Callable[[str, float], None]]=None) -> Tuple[str, Optional[str], str, List[str], List[tuple]]:
+    # progress(stage, fraction) receives the fraction of the whole run (see _STAGE_RANGES);
+    # it is forwarded to generate_pga and called before each file write, and an exception
+    # raised by it (e.g. on cancellation) stops the run between writes.
+    progress = _overall_progress(progress)
+    def report(stage: str, fraction: float):
+        if progress is not None:
+            progress(stage, fraction)
+
+    out = Path(out_dir); out.mkdir(parents=True, exist_ok=True)
+
+    # Ms <-> Mw conversion
+    ms, mw = _convert_magnitudes(mag_value, mag_type, event_date)
 
     # Generate PGA (m/s^2)
     pga_arr, transform, crs, per_model_preds, weights_list = user_pipeline.generate_pga(
-        name, lon, lat, ms, mw, depth_km, radius_km, vs30_path, selected_gmpes=selected_gmpes
+        name, lon, lat, ms, mw, depth_km, radius_km, vs30_path, selected_gmpes=selected_gmpes,
+        progress=progress
     )
+    report("write", 0.0)
     pga_path = out / f"{name}_PGA.tif"
     save_geotiff(pga_path, pga_arr, transform, crs)
 
     # Optional: save per-GMPE unweighted maps (masked to radius)
     per_model_paths: List[str] = []
     if save_per_model:
-        for model_name, arr in per_model_preds:
+        for k, (model_name, arr) in enumerate(per_model_preds):
+            report("write", (k + 1) / (len(per_model_preds) + 1))
             mp = out / f"{name}_PGA_{model_name}.tif"
             save_geotiff(mp, arr, transform, crs)
             per_model_paths.append(str(mp))
 
     # Save weights as txt
     weights_txt = out / f"{name}_GMPE_weights.txt"
-    with open(weights_txt, 'w', encoding='utf-8') as f:
-        f.write("# GMPE Weights\n")
-        for model_name, w in weights_list:
-            f.write(f"{model_name}\t{w:.6f}\n")
+    _write_weights(weights_txt, {"PGA": weights_list})
 
     intensity_path = None
     if convert_to_intensity:
-        if hasattr(user_pipeline, 'pga_to_intensity'):
-            I_arr = user_pipeline.pga_to_intensity(pga_arr)
-        else:
-            raise RuntimeError("Convert to intensity selected, but pga_to_intensity() not found.")
-        intensity_path = out / f"{name}_IntensityI.tif"
-        save_geotiff(intensity_path, I_arr, transform, crs)
-
-        if hasattr(user_pipeline, 'classify_intensity_levels_from_pga'):
-            lvl_arr = user_pipeline.classify_intensity_levels_from_pga(pga_arr)
-            lvl_path = out / f"{name}_IntensityLevel.tif"
-            save_geotiff(lvl_path, lvl_arr, transform, crs, nodata=None)
+        # PGA is already on disk, so its buffer is reused for the intensity grid
+        intensity_path = _write_intensity(out, name, pga_arr, transform, crs, report)
 
+    report("done", 1.0)
     return str(pga_path), (str(intensity_path) if intensity_path else None), str(weights_txt), per_model_paths, weights_list
+
+def run_simulation_ims(name: str, lon: float, lat: float, mag_value: float, mag_type: str, event_date: str,
+                       depth_km: float, radius_km: float, vs30_path: str, out_dir: str,
+                       ims: Sequence[str]=("PGA",), convert_to_intensity: bool=False,
+                       selected_gmpes=None, save_per_model: bool=False,
+                       progress: Optional[Callable[[str, float], None]]=None) -> Tuple[str, Optional[str], str, List[str], Dict[str, List[tuple]]]:
+    """Multi-IM run mode: all `ims` from one shared site/distance pass.
+
+    Writes `{name}_IMs.tif` (one band per IM, in request order, band descriptions = IM names)
+    and a weights file with one section per IM. With convert_to_intensity and PGA among
+    `ims`, the intensity products of run_simulation are written from the PGA band.
+    Returns (product_path, intensity_path, weights_txt, per_model_paths, weights_by_im).
+
+    NOTE: GMPE.py currently ships PGA coefficient rows only (see gmpe_registry.list_ims()),
+    so in practice the product has a single PGA band until PGV/SA rows are added.
+    """
+    progress = _overall_progress(progress)
+    def report(stage: str, fraction: float):
+        if progress is not None:
+            progress(stage, fraction)
+
+    out = Path(out_dir); out.mkdir(parents=True, exist_ok=True)
+    ms, mw = _convert_magnitudes(mag_value, mag_type, event_date)
+
+    im_arrs, transform, crs, per_model_preds, weights_by_im = user_pipeline.generate_ims(
+        name, lon, lat, ms, mw, depth_km, radius_km, vs30_path, ims=ims,
+        selected_gmpes=selected_gmpes, progress=progress
+    )
+    report("write", 0.0)
+    product_path = out / f"{name}_IMs.tif"
+    save_geotiff_bands(product_path, list(im_arrs.items()), transform, crs)
+
+    per_model_paths: List[str] = []
+    if save_per_model:
+        n_maps = sum(len(preds) for preds in per_model_preds.values()); k = 0
+        for im, preds in per_model_preds.items():
+            for model_name, arr in preds:
+                k += 1; report("write", k / (n_maps + 1))
+                mp = out / f"{name}_{_im_tag(im)}_{model_name}.tif"
+                save_geotiff(mp, arr, transform, crs)
+                per_model_paths.append(str(mp))
+
+    weights_txt = out / f"{name}_GMPE_weights.txt"
+    _write_weights(weights_txt, weights_by_im)
+
+    intensity_path = None
+    if convert_to_intensity and "PGA" in im_arrs:
+        intensity_path = _write_intensity(out, name, im_arrs["PGA"], transform, crs, report)
+
+    report("done", 1.0)
+    return str(product_path), (str(intensity_path) if intensity_path else None), str(weights_txt), per_model_paths, weights_by_im
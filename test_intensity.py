@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from intensity import intensity_stage, classify_intensity_levels_from_pga, pga_to_intensity, LEVEL_NODATA
+
+EDGES = np.array([0.457, 0.936, 1.94, 4.01, 8.30, 17.2, 35.5])
+
+
+def _mask_chain_levels(p):
+    """Reference: the original eight-mask classification."""
+    levels = np.full(p.shape, np.nan)
+    m = np.isfinite(p)
+    levels[m & (p < 0.457)] = 0
+    levels[m & (p >= 0.457) & (p <= 0.936)] = 1
+    levels[m & (p > 0.936) & (p <= 1.94)] = 2
+    levels[m & (p > 1.94) & (p <= 4.01)] = 3
+    levels[m & (p > 4.01) & (p <= 8.30)] = 4
+    levels[m & (p > 8.30) & (p <= 17.2)] = 5
+    levels[m & (p > 17.2) & (p <= 35.5)] = 6
+    levels[m & (p > 35.5)] = 7
+    return levels
+
+
+def _pga_grid():
+    p = np.exp(np.random.default_rng(0).uniform(-4, 4, (300, 400)))
+    p.flat[:7] = EDGES
+    p.flat[7:14] = np.nextafter(EDGES, -np.inf)
+    p.flat[14:21] = np.nextafter(EDGES, np.inf)
+    p[5, :] = np.nan
+    p[6, :3] = [np.inf, -np.inf, -1.0]
+    return p
+
+
+def test_matches_mask_chain_and_log_law():
+    p = _pga_grid()
+    ref = _mask_chain_levels(p)
+    res = intensity_stage(p)
+    assert res.levels.dtype == np.uint8
+    assert np.array_equal(np.where(res.levels == LEVEL_NODATA, np.nan, res.levels), ref, equal_nan=True)
+    assert np.array_equal(res.intensity, pga_to_intensity(p), equal_nan=True)
+    assert res.counts.tolist() == [int((ref == k).sum()) for k in range(8)]
+    assert np.array_equal(classify_intensity_levels_from_pga(p), ref, equal_nan=True)
+
+
+def test_levels_only_and_in_place():
+    p = _pga_grid()
+    assert intensity_stage(p, intensity=False).intensity is None
+    q = p.copy()
+    res = intensity_stage(q, out_intensity=q)
+    assert res.intensity is q
+    assert np.array_equal(q, pga_to_intensity(p), equal_nan=True)
+    assert np.array_equal(res.levels, intensity_stage(p, intensity=False).levels)
+
+
+def test_empty_grids():
+    for shape in [(0,), (3, 0), (0, 4)]:
+        p = np.empty(shape)
+        res = intensity_stage(p, cell_areas=np.ones(shape))
+        assert res.intensity.shape == shape and res.levels.shape == shape and res.levels.dtype == np.uint8
+        assert res.counts.tolist() == [0] * 8 and res.areas.tolist() == [0.0] * 8
+        assert classify_intensity_levels_from_pga(p).shape == shape
+
+
+def test_areas_match_masked_circle(vs30_tif):
+    from vs30_io import read_vs30_crop_resample, cell_area_km2
+    from distances import Cal_Re
+
+    lon, lat, radius_km = 101.5, 36.5, 60.0
+    vs30, lat_grid, lon_grid, transform, crs = read_vs30_crop_resample(vs30_tif, lon, lat, radius_km)
+    inside = Cal_Re(lon, lat, lon_grid, lat_grid) <= radius_km
+    pga = np.where(inside, 1.0, np.nan)
+
+    res = intensity_stage(pga, cell_areas=cell_area_km2(transform, crs, pga.shape))
+    assert res.counts.sum() == inside.sum()
+
+    # Reference: area of the masked circle (radius_km, clipped to the grid's lon/lat box)
+    # by fine spherical quadrature, independent of the per-cell areas.
+    from pyproj import Transformer
+    to_ll = Transformer.from_crs(crs, "EPSG:4326", always_xy=True)
+    h, w = pga.shape
+    lon0, lat1 = to_ll.transform(transform.c, transform.f)
+    lon1, lat0 = to_ll.transform(transform.c + w * transform.a, transform.f + h * transform.e)
+    n = 2000
+    lons = lon0 + (np.arange(n) + 0.5) * (lon1 - lon0) / n
+    lats = lat0 + (np.arange(n) + 0.5) * (lat1 - lat0) / n
+    LON, LAT = np.meshgrid(lons, lats)
+    dA = 6371.0 ** 2 * np.cos(np.radians(LAT)) * np.radians((lon1 - lon0) / n) * np.radians((lat1 - lat0) / n)
+    masked_circle = dA[Cal_Re(lon, lat, LON, LAT) <= radius_km].sum()
+
+    assert res.areas.sum() == pytest.approx(masked_circle, rel=0.02)
+    # the projected pixel count alone overstates the area by ~1/cos^2(lat)
+    assert res.counts.sum() > 1.4 * masked_circle
@@ -0,0 +1,88 @@
+import os
+import signal
+import time
+
+import pytest
+
+from job_manager import JobManager, QueueFull, DONE, FAILED, CANCELLED, QUEUED
+
+
+def _kwargs(vs30_tif, out_dir, **kw):
+    base = dict(lon=101.5, lat=36.5, mag_value=6.2, mag_type="Ms", event_date="18122023",
+                depth_km=10.0, radius_km=30.0, vs30_path=vs30_tif, out_dir=str(out_dir),
+                convert_to_intensity=False)
+    base.update(kw)
+    return base
+
+
+def _wait(manager, jobs, timeout=120.0):
+    end = time.time() + timeout
+    while not all(j.is_finished for j in jobs):
+        assert time.time() < end, [(j.name, j.status, j.stage) for j in jobs]
+        manager.poll()
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def manager():
+    m = JobManager(max_workers=1, max_queued=1)
+    yield m
+    m.shutdown()
+
+
+def test_queue_bound_duplicates_and_queued_cancel(manager, vs30_tif, tmp_path):
+    a = manager.submit("a", **_kwargs(vs30_tif, tmp_path))
+    with pytest.raises(ValueError):
+        manager.submit("a", **_kwargs(vs30_tif, str(tmp_path) + "/"))  # same folder + name
+    b = manager.submit("b", **_kwargs(vs30_tif, tmp_path))
+    assert b.status == QUEUED
+    with pytest.raises(QueueFull):
+        manager.submit("c", **_kwargs(vs30_tif, tmp_path))
+
+    assert manager.cancel(b.id) and b.status == CANCELLED
+    _wait(manager, [a])
+    assert a.status == DONE and a.progress == 1.0 and a.elapsed > 0
+    assert os.path.exists(a.result[0])
+    assert not (tmp_path / "b_PGA.tif").exists()
+    # finished jobs no longer block their outputs
+    _wait(manager, [manager.submit("a", **_kwargs(vs30_tif, tmp_path))])
+
+
+def test_cancel_running_job(manager, vs30_tif, tmp_path):
+    job = manager.submit("run", **_kwargs(vs30_tif, tmp_path))
+    assert manager.cancel(job.id)
+    _wait(manager, [job])
+    assert job.status == CANCELLED
+    assert not (tmp_path / "run_PGA.tif").exists()
+
+
+def test_failure_keeps_worker_traceback(manager, vs30_tif, tmp_path):
+    job = manager.submit("bad", **_kwargs(str(tmp_path / "missing.tif"), tmp_path))
+    _wait(manager, [job])
+    assert job.status == FAILED and "missing.tif" in job.error
+    assert "Traceback" in job.traceback and "read_vs30_crop_resample" in job.traceback
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs POSIX signals")
+def test_pool_rebuilt_after_worker_dies(manager, vs30_tif, tmp_path):
+    def kill_workers():
+        for pid in list(manager._executor._processes):
+            os.kill(pid, signal.SIGKILL)
+
+    # a worker dying under a running job fails that job only
+    victim = manager.submit("victim", **_kwargs(vs30_tif, tmp_path))
+    kill_workers()
+    _wait(manager, [victim])
+    assert victim.status == FAILED
+
+    # an idle pool whose worker died is replaced on the next submit
+    warm = manager.submit("warm", **_kwargs(vs30_tif, tmp_path))
+    _wait(manager, [warm])
+    kill_workers()
+    end = time.time() + 30
+    while not manager._executor._broken:
+        assert time.time() < end
+        time.sleep(0.05)
+    after = manager.submit("after", **_kwargs(vs30_tif, tmp_path))
+    _wait(manager, [after])
+    assert warm.status == DONE and after.status == DONE
@@ -0,0 +1,45 @@
+import datetime as dt
+
+import numpy as np
+import pytest
+
+import mag_convert as mc
+
+
+def _catalog(n=5000):
+    rng = np.random.default_rng(0)
+    mags = np.round(rng.uniform(3, 9, n), 2)
+    mags[:20] = 7.0
+    days = rng.integers(-30000, 20000, n)
+    dates = [(dt.date(1970, 1, 1) + dt.timedelta(days=int(d))).strftime("%d%m%Y") for d in days]
+    dates[:4] = ["31121965", "01011966", "31122015", "01011900"]
+    return mags, dates
+
+
+def test_arrays_bit_identical_to_scalar():
+    mags, dates = _catalog()
+    assert np.array_equal(mc.ms_to_mw_array(mags, dates), [mc.ms_to_mw(m, d) for m, d in zip(mags, dates)])
+    assert np.array_equal(mc.mw_to_ms_array(mags, dates), [mc.mw_to_ms(m, d) for m, d in zip(mags, dates)])
+
+    types = np.where(np.arange(mags.size) % 2, "Ms", "mw")
+    ms, mw = mc.convert_catalog(mags, types, dates)
+    is_ms = types == "Ms"
+    assert np.array_equal(ms[is_ms], mags[is_ms]) and np.array_equal(mw[~is_ms], mags[~is_ms])
+    assert np.array_equal(mw[is_ms], mc.ms_to_mw_array(mags[is_ms], np.asarray(dates)[is_ms]))
+    assert np.array_equal(ms[~is_ms], mc.mw_to_ms_array(mags[~is_ms], np.asarray(dates)[~is_ms]))
+
+
+def test_empty_and_mixed_dates():
+    assert mc.parse_dates([]).dtype == np.dtype("M8[D]")
+    assert mc.ms_to_mw_array([], []).size == 0
+    assert all(a.size == 0 for a in mc.convert_catalog([], [], []))
+
+    mixed = [dt.date(1927, 7, 12), "18122023", np.datetime64("1970-01-01")]
+    expected = [dt.date(1927, 7, 12), dt.date(2023, 12, 18), dt.date(1970, 1, 1)]
+    assert mc.parse_dates(np.array(mixed, dtype=object)).tolist() == expected
+    assert np.array_equal(mc.ms_to_mw_array([7.5, 6.0, 6.0], mixed),
+                          [mc.ms_to_mw(7.5, "12071927"), mc.ms_to_mw(6.0, "18122023"), mc.ms_to_mw(6.0, "01011970")])
+
+    for bad in (np.array(["NaT"], "M8[D]"), np.array(["2000-01-01", "NaT"], "M8[s]"), ["31022000"]):
+        with pytest.raises(ValueError):
+            mc.ms_to_mw_array(np.full(len(bad), 6.0), bad)
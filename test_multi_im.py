@@ -0,0 +1,111 @@
+import os
+from functools import partial
+
+import numpy as np
+import pytest
+
+import GMPE
+import gmpe_registry
+
+# Dummy second IM: the Zhou_2019 formula with a different unit divisor, as a new table row would be
+SA1 = "SA(1.0)"
+_SA1_ROW = GMPE._ZHOU2019_COEFFS["PGA"][:-1] + (200,)
+
+
+@pytest.fixture
+def sa_registry(monkeypatch):
+    """Register SA(1.0) for Zhou_2019 and HH_1992 only, as GMPE.GMPE_IMS entries."""
+    ims = {k: dict(v) for k, v in GMPE.GMPE_IMS.items()}
+    ims["Zhou_2019"][SA1] = partial(GMPE._zhou_2019, _SA1_ROW)
+    ims["HH_1992"][SA1] = lambda *a: 0.3 * GMPE.gmpe_HH_1992(*a)
+    monkeypatch.setattr(GMPE, "GMPE_IMS", ims)
+    monkeypatch.setattr(gmpe_registry, "_GMPE_IMS", gmpe_registry.load_im_registry(gmpe_registry._GMPE_REGISTRY))
+    gmpe_registry.set_gmpes(None)
+    yield
+    gmpe_registry.set_gmpes(None)
+
+
+def test_im_registry(sa_registry):
+    assert gmpe_registry.list_ims() == ["PGA", SA1]
+    assert gmpe_registry.model_ims("Zhou_2019") == ["PGA", SA1]
+    assert gmpe_registry.model_ims("Si_1999") == ["PGA"]
+    assert [n for n, _ in gmpe_registry.active_im_pairs(SA1)] == [n for n in gmpe_registry.list_gmpes()
+                                                                   if n in ("Zhou_2019", "HH_1992")]
+    gmpe_registry.set_gmpes(["Si_1999", "HH_1992"])
+    assert [n for n, _ in gmpe_registry.active_im_pairs(SA1)] == ["HH_1992"]
+
+
+def _two_pass_pga(lon, lat, ms, mw, depth_km, radius_km, vs30_path):
+    """Reference: the original generate_pga (samples at in-radius cells, then full grids)."""
+    from vs30_io import read_vs30_crop_resample
+    from distances import Cal_Re, Cal_Rh
+    from weights import estimate_weights
+
+    vs30, lat_grid, lon_grid, transform, crs = read_vs30_crop_resample(vs30_path, lon, lat, radius_km)
+    Re = Cal_Re(lon, lat, lon_grid, lat_grid)
+    Rh = Cal_Rh(Re, depth_km)
+    mask = Re <= float(radius_km)
+    idx = np.where(mask)
+    active = gmpe_registry.active_pairs()
+    samples = [np.asarray(fn(ms, mw, Re[idx], Rh[idx], vs30[idx], depth_km), dtype=float) for _, fn in active]
+    w_arr = estimate_weights(samples)
+    per_model, stack = [], []
+    for (name, fn), wi in zip(active, w_arr):
+        a = np.asarray(fn(ms, mw, Re, Rh, vs30, depth_km), dtype=float).copy()
+        a[~mask] = np.nan
+        per_model.append((name, a))
+        if wi > 0 and np.isfinite(wi):
+            stack.append(wi * a)
+    return np.sum(stack, axis=0), per_model, [(n, float(w)) for (n, _), w in zip(active, w_arr)]
+
+
+def test_generate_pga_matches_two_pass(vs30_tif):
+    import user_pipeline
+
+    args = (101.5, 36.5, 6.2, 6.1, 10.0, 40.0, vs30_tif)
+    pga, _, _, per_model, weights = user_pipeline.generate_pga("t", *args)
+    ref_pga, ref_per_model, ref_weights = _two_pass_pga(*args)
+    assert weights == ref_weights
+    assert np.array_equal(pga, ref_pga, equal_nan=True)
+    for (n, a), (rn, ra) in zip(per_model, ref_per_model):
+        assert n == rn and np.array_equal(a, ra, equal_nan=True)
+
+
+def test_run_simulation_ims_multi_band(sa_registry, vs30_tif, tmp_path):
+    rasterio = pytest.importorskip("rasterio")
+    import user_pipeline
+    from pipeline_adapter import run_simulation_ims
+
+    product, intensity_path, weights_txt, per_model_paths, weights_by_im = run_simulation_ims(
+        name="ev", lon=101.5, lat=36.5, mag_value=6.2, mag_type="Ms", event_date="18122023",
+        depth_km=10.0, radius_km=40.0, vs30_path=vs30_tif, out_dir=str(tmp_path),
+        ims=[SA1, "PGA"], convert_to_intensity=True, save_per_model=True,
+    )
+    with rasterio.open(product) as ds:
+        assert ds.count == 2 and ds.descriptions == (SA1, "PGA")
+        sa_band, pga_band = ds.read(1), ds.read(2)
+
+    from mag_convert import ms_to_mw
+    pga, *_ = user_pipeline.generate_pga("ev", 101.5, 36.5, 6.2, ms_to_mw(6.2, "18122023"), 10.0, 40.0, vs30_tif)
+    assert np.array_equal(pga_band, pga, equal_nan=True)
+    assert not np.array_equal(sa_band, pga_band, equal_nan=True)
+
+    assert [n for n, _ in weights_by_im[SA1]] == [n for n, _ in gmpe_registry.active_im_pairs(SA1)]
+    lines = open(weights_txt, encoding="utf-8").read().splitlines()
+    assert lines[0] == "# GMPE Weights"
+    assert lines.index(f"# {SA1}") == 1 and lines.index("# PGA") == 2 + len(weights_by_im[SA1])
+
+    names = sorted(os.path.basename(p) for p in per_model_paths)
+    assert names == sorted([f"ev_SA1.0_{n}.tif" for n, _ in weights_by_im[SA1]]
+                           + [f"ev_PGA_{n}.tif" for n, _ in weights_by_im["PGA"]])
+    assert intensity_path and intensity_path.endswith("ev_IntensityI.tif")
+
+
+def test_save_geotiff_bands_checks_shapes(tmp_path):
+    pytest.importorskip("rasterio")
+    from io_geotiff import save_geotiff_bands
+    from rasterio.transform import from_origin
+
+    with pytest.raises(ValueError):
+        save_geotiff_bands(tmp_path / "x.tif", [("A", np.zeros((2, 2))), ("B", np.zeros((2, 3)))],
+                           from_origin(0, 0, 1, 1), "EPSG:3395")
@@ -1,34 +1,72 @@
 
 from __future__ import annotations
-from typing import Tuple, Optional, List
+from typing import Tuple, Optional, List, Callable, Dict, Sequence
 import numpy as np
 
-from gmpe_registry import list_gmpes, set_gmpes, active_pairs
+from gmpe_registry import list_gmpes, list_ims, set_gmpes, active_pairs, active_im_pairs
 from vs30_io import read_vs30_crop_resample
 from distances import Cal_Re, Cal_Rh
 from weights import estimate_weights
-from intensity import pga_to_intensity, classify_intensity_levels_from_pga  # re-exported
+from intensity import (pga_to_intensity, classify_intensity_levels_from_pga,  # re-exported
+                       intensity_stage, INTENSITY_SCALES, LEVEL_NODATA)
 
 __all__ = [
-    "list_gmpes", "set_gmpes",
-    "generate_pga",
+    "list_gmpes", "list_ims", "set_gmpes",
+    "generate_pga", "generate_ims",
     "pga_to_intensity", "classify_intensity_levels_from_pga",
+    "intensity_stage", "INTENSITY_SCALES", "LEVEL_NODATA",
 ]
 
+ProgressFn = Callable[[str, float], None]
+
+def _report(progress: Optional[ProgressFn], stage: str, fraction: float):
+    """Forward a stage update; the callback may raise to cancel the run."""
+    if progress is not None:
+        progress(stage, float(fraction))
+
 def generate_pga(name: str, lon: float, lat: float, ms: float, mw: float, depth_km: float,
-                 radius_km: float, vs30_path: str, selected_gmpes: Optional[List[str]]=None) -> Tuple[np.ndarray, object, object, list, list]:
+                 radius_km: float, vs30_path: str, selected_gmpes: Optional[List[str]]=None,
+                 progress: Optional[ProgressFn]=None) -> Tuple[np.ndarray, object, object, list, list]:
     """
     Returns (pga_arr [m/s^2], transform, crs, per_model_preds, weights_list).
     - per_model_preds: List[(model_name, unweighted_pga_grid)]
     - weights_list:    List[(model_name, weight)]
     - Output GeoTIFF extent is rectangular (crop to square bbox of radius_km in EPSG:3395),
       but values are only preserved inside the radius; outside are NaN.
+    - progress: optional callback(stage, fraction) called between stages and per model.
+      It doubles as the cancellation point: an exception raised by it aborts the run.
+    """
+    im_arrs, transform, crs, per_model, weights = generate_ims(
+        name, lon, lat, ms, mw, depth_km, radius_km, vs30_path, ims=("PGA",),
+        selected_gmpes=selected_gmpes, progress=progress
+    )
+    return im_arrs["PGA"], transform, crs, per_model["PGA"], weights["PGA"]
+
+def generate_ims(name: str, lon: float, lat: float, ms: float, mw: float, depth_km: float,
+                 radius_km: float, vs30_path: str, ims: Sequence[str]=("PGA",),
+                 selected_gmpes: Optional[List[str]]=None,
+                 progress: Optional[ProgressFn]=None) -> Tuple[Dict[str, np.ndarray], object, object, dict, dict]:
     """
+    Multi-IM variant of generate_pga: one VS30 reprojection and one distance/mask pass
+    shared by all IMs; each extra IM only costs its model evaluations and weight fit.
+    Returns (im_arrs, transform, crs, per_model_preds, weights), each keyed by IM:
+    - im_arrs:         Dict[IM, weighted grid]
+    - per_model_preds: Dict[IM, List[(model_name, unweighted_grid)]]
+    - weights:         Dict[IM, List[(model_name, weight)]], estimated per IM
+    Only active models that declare an IM (see GMPE.GMPE_IMS) contribute to it.
+    """
+    ims = list(dict.fromkeys(ims))
+    if not ims:
+        raise ValueError("No intensity measures requested.")
+
+    _report(progress, "vs30", 0.0)
     vs30, lat_grid, lon_grid, transform, crs = read_vs30_crop_resample(vs30_path, lon, lat, radius_km)
 
+    _report(progress, "distances", 0.0)
     Re = Cal_Re(lon, lat, lon_grid, lat_grid)
     Rh = Cal_Rh(Re, depth_km)
     mask = Re <= float(radius_km)  # only inside radius are valid for weights & outputs
+    outside = ~mask
 
     # Model subset
     set_gmpes(selected_gmpes)  # None/[] means "use all"
@@ -37,32 +75,35 @@ def generate_pga(name: str, lon: float, lat: float, ms: float, mw: float, depth_
     if not active:
         raise RuntimeError("No active GMPEs. Check GMPE.py registry.")
 
-    # Use ALL cells within radius for weighting
-    idx = np.where(mask)
-
-    # Collect samples per GMPE
-    samples = []
-    for name_i, fn in active:
-        pred = fn(float(ms), float(mw), Re[idx], Rh[idx], vs30[idx], float(depth_km))
-        samples.append(np.asarray(pred, dtype=float))
+    pairs_by_im = {}
+    for im in ims:
+        pairs_by_im[im] = active_im_pairs(im)
+        if not pairs_by_im[im]:
+            raise RuntimeError(f"No active GMPE provides {im}.")
+    n_total = sum(len(p) for p in pairs_by_im.values())
 
-    w_arr = estimate_weights(samples)
-    weights_list = [(nm, float(wi)) for (nm,_), wi in zip(active, w_arr)]
+    im_arrs, per_model_preds, weights = {}, {}, {}
+    done = 0
+    for im in ims:
+        pairs = pairs_by_im[im]
+        # Full-grid prediction per model; weighting samples are ALL cells within radius
+        preds, samples = [], []
+        for name_i, fn in pairs:
+            _report(progress, "predict", done / n_total); done += 1
+            arr = np.array(fn(float(ms), float(mw), Re, Rh, vs30, float(depth_km)), dtype=float)
+            samples.append(arr[mask])
+            arr[outside] = np.nan  # mask per-model outside radius
+            preds.append((name_i, arr))
 
-    # Per-model full predictions and weighted sum
-    per_model_preds = []
-    pga_stack = []
-    for (name_i, fn), wi in zip(active, w_arr):
-        pred_full = fn(float(ms), float(mw), Re, Rh, vs30, float(depth_km))
-        arr = np.asarray(pred_full, dtype=float)
-        # mask per-model outside radius
-        a = arr.copy(); a[~mask] = np.nan
-        per_model_preds.append((name_i, a))
-        if wi > 0 and np.isfinite(wi):
-            pga_stack.append(wi * a)
+        _report(progress, "weights", done / n_total)
+        w_arr = estimate_weights(samples)
+        weights[im] = [(nm, float(wi)) for (nm,_), wi in zip(pairs, w_arr)]
+        per_model_preds[im] = preds
 
-    if not pga_stack:
-        raise RuntimeError("No predictions produced by active GMPEs.")
+        stack = [wi * a for (_, a), wi in zip(preds, w_arr) if wi > 0 and np.isfinite(wi)]
+        if not stack:
+            raise RuntimeError(f"No {im} predictions produced by active GMPEs.")
+        im_arrs[im] = np.sum(stack, axis=0)
 
-    pga = np.sum(pga_stack, axis=0)
-    return pga, transform, crs, per_model_preds, weights_list
+    _report(progress, "predict", 1.0)
+    return im_arrs, transform, crs, per_model_preds, weights
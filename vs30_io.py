@@ -21,13 +21,16 @@ transform : rasterio.Affine
     Target grid transform in EPSG:3395.
 crs : rasterio.crs.CRS
     Target CRS (EPSG:3395).
+
+`cell_area_km2` gives the true (WGS84 ellipsoid) ground area of the grid cells;
+Mercator pixels of fixed size cover less ground away from the equator.
 """
 from typing import Tuple
 import numpy as np
 import rasterio
 from rasterio.transform import from_origin
 from rasterio.warp import reproject, Resampling
-from pyproj import Transformer, CRS
+from pyproj import Transformer, CRS, Geod
 
 
 def read_vs30_crop_resample(
@@ -104,3 +107,28 @@ def read_vs30_crop_resample(
     lon_grid, lat_grid = to_ll.transform(xs, ys)
 
     return dst, np.asarray(lat_grid), np.asarray(lon_grid), transform, dst_crs
+
+
+def cell_area_km2(transform, crs, shape) -> np.ndarray:
+    """Geodesic ground area (km^2) of each cell of a north-up grid in a cylindrical CRS.
+
+    All cells of a row share one area in such grids (EPSG:3395 here), so the result has
+    shape (H, 1) and broadcasts against the (H, W) grid.
+    """
+    height = int(shape[0])
+    to_ll = Transformer.from_crs(crs, "EPSG:4326", always_xy=True)
+    geod = Geod(ellps="WGS84")
+
+    # Row edge y coordinates and the left/right x of one cell
+    ys = transform.f + np.arange(height + 1) * transform.e
+    x0, x1 = transform.c, transform.c + transform.a
+    lon0, lat_edges = to_ll.transform(np.full(ys.shape, x0), ys)
+    lon1, _ = to_ll.transform(np.full(ys.shape, x1), ys)
+
+    areas = np.empty((height, 1), dtype=float)
+    for r in range(height):
+        lons = [lon0[r], lon1[r], lon1[r + 1], lon0[r + 1]]
+        lats = [lat_edges[r], lat_edges[r], lat_edges[r + 1], lat_edges[r + 1]]
+        area_m2, _ = geod.polygon_area_perimeter(lons, lats)
+        areas[r, 0] = abs(area_m2) / 1e6
+    return areas